@@ -1,11 +1,11 @@
-import re
 import os
 import sys
 import math
+import mmap
 import time
 import json
 import codecs
-import urllib
+import urllib.parse
 import shutil
 import string
 import hashlib
@@ -13,15 +13,23 @@ import pathlib
 import warnings
 import argparse
 
+from stat import S_ISREG, S_ISDIR
 from operator import methodcaller
-from itertools import repeat, chain
-from functools import partial
-from collections import namedtuple
+from bisect import bisect_left, bisect_right
+from itertools import repeat, chain, accumulate
+from functools import lru_cache
+from collections import namedtuple, deque
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import tqdm
 except ImportError:
-    pass
+    tqdm = None
+
+try:
+    from fastbencode import bdecode as _fastBdecode
+except ImportError:
+    _fastBdecode = None
 
 
 
@@ -58,74 +66,216 @@ Public Helper Functions
 ====================================================================================================================='''
 
 
-def bencode(obj, enc:str='UTF-8') -> bytes:
-    '''Bencode objects. Modified from <https://github.com/utdemir/bencoder>.'''
-    if isinstance(obj, bytes):
-        ret = str(len(obj)).encode(enc) + b":" + obj
-    elif isinstance(obj, str):
-        ret = bencode(obj.encode(enc))
-    elif isinstance(obj, int):
-        ret = b"i" + str(obj).encode(enc) + b"e"
-    elif isinstance(obj, (list, tuple)):
-        ret = b"l" + b"".join(map(partial(bencode, enc=enc), obj)) + b"e"
-    elif isinstance(obj, dict):
-        ret = b'd'
-        for key, val in sorted(obj.items()):
-            if isinstance(key, (bytes, str)):
-                ret += bencode(key, enc) + bencode(val, enc)
-            else:
-                raise TypeError(f"Expect str or bytes, not {key}:{type(key)}.")
-        ret += b'e'
-    else:
-        raise TypeError(f"Expect int, bytes, list or dict, not {obj}:{type(obj)}.")
+def _bencodeBytes(obj, out:list, enc:str):
+    out.append(b"%d:" % len(obj)) # the length prefix is always ascii digits
+    out.append(obj) # appended as is, so large strings like `pieces` are copied only once by the final join
 
-    return ret
 
+def _bencodeStr(obj, out:list, enc:str):
+    _bencodeBytes(obj.encode(enc), out, enc)
 
-def bdecode(s:bytes, encoding='ascii'):
-    '''Bdecode bytes. Modified from <https://github.com/utdemir/bencoder>.'''
 
-    def decode_first(s):
-        if s.startswith(b"i"):
-            match = re.match(b"i(-?\\d+)e", s)
-            return int(match.group(1)), s[match.span()[1]:]
-        elif s.startswith(b"l") or s.startswith(b"d"):
-            l = []
-            rest = s[1:]
-            while not rest.startswith(b"e"):
-                elem, rest = decode_first(rest)
-                l.append(elem)
-            rest = rest[1:]
-            if s.startswith(b"l"):
-                return l, rest
-            else:
-                return {i: j for i, j in zip(l[::2], l[1::2])}, rest
-        elif any(s.startswith(i.encode(encoding)) for i in string.digits):
-            m = re.match(b"(\\d+):", s)
-            length = int(m.group(1))
-            rest_i = m.span()[1]
-            start = rest_i
-            end = rest_i + length
-            return s[start:end], s[end:]
+def _bencodeInt(obj, out:list, enc:str):
+    out.append(b"i%de" % obj)
+
+
+def _bencodeList(obj, out:list, enc:str):
+    out.append(b"l")
+    for item in obj:
+        _bencodeInto(item, out, enc)
+    out.append(b"e")
+
+
+def _bencodeDict(obj, out:list, enc:str):
+    out.append(b"d")
+    for key, val in sorted(obj.items()):
+        if isinstance(key, (bytes, str)):
+            _bencodeInto(key, out, enc)
+            _bencodeInto(val, out, enc)
+        else:
+            raise TypeError(f"Expect str or bytes, not {key}:{type(key)}.")
+    out.append(b"e")
+
+
+class _Bencoded():
+    '''Wrap bytes that are already bencoded, so that `bencode()` embeds them as is.'''
+    __slots__ = ('bchars',)
+
+    def __init__(self, bchars:bytes):
+        self.bchars = bchars
+
+
+def _bencodeRaw(obj, out:list, enc:str):
+    out.append(obj.bchars)
+
+
+# map each supported type to its encoder, so that most objects are dispatched by a single dict lookup
+_BENCODERS = {
+    bytes: _bencodeBytes,
+    bytearray: _bencodeBytes,
+    str: _bencodeStr,
+    int: _bencodeInt,
+    list: _bencodeList,
+    tuple: _bencodeList,
+    dict: _bencodeDict,
+    _Bencoded: _bencodeRaw,
+}
+
+
+def _bencodeInto(obj, out:list, enc:str):
+    '''Bencode objects by appending the fragments to `out`, which avoids copying the growing result.'''
+    if (encoder := _BENCODERS.get(type(obj))) is None:
+        # subclasses of supported types (e.g. bool, OrderedDict) need a slower isinstance() search
+        for tobj, encoder in _BENCODERS.items():
+            if isinstance(obj, tobj):
+                break
+        else:
+            raise TypeError(f"Expect int, bytes, list or dict, not {obj}:{type(obj)}.")
+    encoder(obj, out, enc)
+
+
+def _bencodeFileList(fsizes, fparts_list, enc:str) -> bytes:
+    '''Bencode the `files` list of `info` straight from file sizes and path parts.
+
+    Every item has the same shape {b'length': int, b'path': [str, ...]}, so the keys are emitted as constant prefixes
+    rather than building and dispatching a dict per file. The result is identical to the generic `bencode()`.
+    '''
+    out = [b"l"]
+    append = out.append
+    for fsize, fparts in zip(fsizes, fparts_list):
+        append(b"d6:lengthi%de4:pathl" % fsize)
+        for part in fparts:
+            part = part.encode(enc)
+            append(b"%d:" % len(part))
+            append(part)
+        append(b"ee")
+    append(b"e")
+    return b"".join(out)
+
+
+def bencode(obj, enc:str='UTF-8') -> bytes:
+    '''Bencode objects. Modified from <https://github.com/utdemir/bencoder>.'''
+    parts = []
+    _bencodeInto(obj, parts, enc)
+    return b"".join(parts)
+
+
+def _bdecodeFrom(s:bytes, i:int):
+    '''Bdecode the first object starting at index `i` of `s`, and return it with the index right after it.'''
+    c = s[i]
+    if c == 0x69: # b"i"
+        end = s.index(b"e", i)
+        digits = s[i+1:end]
+        if not (digits.isdigit() or (digits[:1] == b"-" and digits[1:].isdigit())): # `int()` is more tolerant
+            raise BdecodeError("Malformed input.")
+        return int(digits), end + 1
+    elif c == 0x6c or c == 0x64: # b"l" or b"d"
+        l = []
+        j = i + 1
+        while s[j] != 0x65: # b"e"
+            elem, j = _bdecodeFrom(s, j)
+            l.append(elem)
+        if c == 0x6c:
+            return l, j + 1
         else:
+            it = iter(l)
+            return {k: v for k, v in zip(it, it)}, j + 1
+    elif 0x30 <= c <= 0x39: # b"0" to b"9"
+        start = s.index(b":", i) + 1
+        digits = s[i:start-1]
+        if not digits.isdigit():
             raise BdecodeError("Malformed input.")
+        end = start + int(digits)
+        if end > len(s):
+            raise BdecodeError("Malformed input.")
+        return s[start:end], end
+    else:
+        raise BdecodeError("Malformed input.")
 
-    s = s.encode(encoding) if isinstance(s, str) else s
-    ret, rest = decode_first(s)
-    if rest:
+
+def bdecode(s:bytes, encoding='ascii'):
+    '''Bdecode bytes. Modified from <https://github.com/utdemir/bencoder>.'''
+    s = s.encode(encoding) if isinstance(s, str) else bytes(s)
+    if _fastBdecode is not None:
+        try:
+            return _fastBdecode(s)
+        except ValueError: # the compiled decoder is stricter (e.g. on dict key order), let ours decide
+            pass
+    try:
+        ret, end = _bdecodeFrom(s, 0)
+    except (IndexError, ValueError): # `bytes.index()` raises ValueError if the delimiter is not found
+        raise BdecodeError("Malformed input.")
+    if end != len(s):
         raise BdecodeError("Malformed input.")
 
     return ret
 
 
+@lru_cache(maxsize=32)
+def _lookupCodec(enc:str):
+    '''Return the codec info of the encoding, raise LookupError if not exists.'''
+    return codecs.lookup(enc)
+
+
+@lru_cache(maxsize=256)
+def _quote(chars:str) -> str:
+    '''Return the percent-encoded str, cached as the same trackers are quoted again and again.'''
+    return urllib.parse.quote(chars)
+
+
+# sha1 is used for integrity rather than security, which also keeps it usable on FIPS-restricted builds (python 3.9+)
+if sys.version_info >= (3, 9):
+    def _sha1(data=b'', /):
+        return hashlib.sha1(data, usedforsecurity=False)
+else:
+    _sha1 = hashlib.sha1
+
+# the builtin fallback lacks the hardware accelerated (e.g. SHA-NI) code path of OpenSSL
+if hashlib.sha1.__name__ != 'openssl_sha1':
+    warnings.warn('hashlib is not backed by OpenSSL, sha1 hashing can be much slower.', RuntimeWarning)
+
+
+@lru_cache(maxsize=4)
+def _blankPiece(size:int):
+    '''Return a blank (all zeros) piece of the given size and its sha1 hash.'''
+    blank = bytes(size)
+    return blank, _sha1(blank).digest()
+
+
 def hash(bchars:bytes, /) -> bytes:
-    '''Return the sha1 hash for the given bytes.'''
-    if isinstance(bchars, bytes):
-        hasher = hashlib.sha1()
-        hasher.update(bchars)
-        return hasher.digest()
+    '''Return the sha1 hash for the given bytes-like object (bytes, bytearray or memoryview).'''
+    # blank pieces are common in padding and sparse files, and comparing with zeros is much cheaper than sha1
+    # the first and last bytes are tested first, so that normal data rarely pays for the full comparison
+    if isinstance(bchars, (bytes, bytearray)) and len(bchars) >= 16384 and not bchars[0] and not bchars[-1]:
+        blank, sha1 = _blankPiece(len(bchars))
+        if bchars == blank:
+            return sha1
+    if isinstance(bchars, (bytes, bytearray, memoryview)):
+        return _sha1(bchars).digest() # hand over the whole buffer in one call for OpenSSL's block loop
     else:
-        raise TypeError(f"Expect bytes, not {type(bchars)}.")
+        raise TypeError(f"Expect bytes-like object, not {type(bchars)}.")
+
+
+def hashMany(chunks, /, workers=None):
+    '''Yield the sha1 hash for each bytes-like object from the given iterable, in order.
+
+    Chunks are hashed in a thread pool, as `hashlib` releases the GIL on large buffers.
+    Only a few chunks per worker are consumed ahead, so memory use stays bounded for lazy iterables.
+    Each chunk must not be modified until its hash is yielded.
+
+    Arguments:
+    chunks: an iterable of bytes-like objects
+    workers: int=None, the number of hashing threads (default: the number of CPUs)
+    '''
+    workers = int(workers) if workers else (os.cpu_count() or 1)
+    with ThreadPoolExecutor(workers) as executor:
+        futures = deque()
+        for chunk in chunks:
+            futures.append(executor.submit(hash, chunk))
+            if len(futures) >= 2 * workers:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
 
 
 def fromTorrent(path):
@@ -142,11 +292,230 @@ def fromFiles(path):
     return torrent
 
 
+def _adviseSequential(fobj):
+    '''Hint the kernel that the file will be read sequentially, so that it reads ahead more. No-op if unsupported.'''
+    if hasattr(os, 'posix_fadvise'): # not available on Windows
+        try:
+            os.posix_fadvise(fobj.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def _adviseSequentialMmap(fmmap):
+    '''Same as `_adviseSequential()` but for a memory-mapped file. No-op if unsupported.'''
+    if hasattr(mmap, 'MADV_SEQUENTIAL'): # python 3.8+ on platforms with madvise()
+        try:
+            fmmap.madvise(mmap.MADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def _walkFiles(dpath):
+    '''Yield the path and size of each file under the directory recursively, in the same way as `Path.rglob()`.
+
+    Subdirectories are entered without following symlinks, while symlinks to files are included as files.
+    Only a single stat call is made for each file, as the entry type is mostly known from the directory listing.
+    '''
+    try:
+        with os.scandir(dpath) as dentries:
+            dentries = list(dentries)
+    except PermissionError: # skipped as `Path.rglob()` does
+        return
+    for dentry in dentries:
+        if dentry.is_dir(follow_symlinks=False):
+            yield from _walkFiles(dentry.path)
+        elif dentry.is_file():
+            yield dentry.path, dentry.stat().st_size
+
+
+def _readPieces(fpaths, piece_length:int, size_pbar=None, file_pbar=None):
+    '''Yield pieces read from the files as if they were concatenated, each piece in its own buffer.
+
+    Whole pieces within a large file are yielded as slices of the memory-mapped file, rather than copied by reading.
+
+    Arguments:
+    fpaths: the paths of files to be read in order
+    piece_length: the piece size in bytes
+    size_pbar: the progress bar to be updated with the number of bytes read per piece, if any
+    file_pbar: the progress bar to be updated with the number of files read, if any
+    '''
+    piece = bytearray(piece_length)
+    piece_view = memoryview(piece)
+    filled = 0
+    for fpath in fpaths:
+        with fpath.open('rb', buffering=0) as fobj:
+            _adviseSequential(fobj)
+            fmmap = None
+            if (fsize := os.fstat(fobj.fileno()).st_size) >= piece_length: # yield whole pieces as slices of the map
+                try:
+                    fmmap = mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError): # e.g. too large to map on 32-bit platforms, just read it then
+                    pass
+            if fmmap is not None:
+                # not closed explicitly, as the yielded slices may be still in hashing
+                # the map is closed by itself when the last slice is released
+                _adviseSequentialMmap(fmmap)
+                fview = memoryview(fmmap)
+                fsize = len(fmmap) # in case the file has changed since the stat call
+                offset = 0
+                if filled: # complete the piece spanning from the previous file first
+                    offset = piece_length - filled
+                    piece_view[filled:] = fview[:offset]
+                    if size_pbar:
+                        size_pbar.update(piece_length)
+                    yield piece
+                    piece = bytearray(piece_length)
+                    piece_view = memoryview(piece)
+                while offset + piece_length <= fsize:
+                    if size_pbar:
+                        size_pbar.update(piece_length)
+                    yield fview[offset : offset + piece_length]
+                    offset += piece_length
+                filled = fsize - offset # the tail spans to the next file
+                piece_view[:filled] = fview[offset:fsize]
+            else:
+                while (read_size := fobj.readinto(piece_view[filled:])):
+                    filled += read_size
+                    if filled == piece_length: # a new buffer is needed as the yielded one may be still in hashing
+                        if size_pbar: # update once per piece rather than per read, as the update itself is not cheap
+                            size_pbar.update(piece_length)
+                        yield piece
+                        piece = bytearray(piece_length)
+                        piece_view = memoryview(piece)
+                        filled = 0
+        if file_pbar:
+            file_pbar.update(1)
+    if filled:
+        if size_pbar:
+            size_pbar.update(filled)
+        yield piece[:filled]
+
+
+def _readDestPieces(spath, file_list, piece_length:int, broken:list, dest_fsizes={}):
+    '''Yield pieces read from the destination files for verification, each piece in its own buffer.
+
+    Files shorter than recorded are regarded as padded with zeros, while pieces covered by missing files are yielded as
+    blank pieces with their indices appended to `broken`, as they are broken whatever their hashes are.
+
+    Arguments:
+    spath: the path to the destination files
+    file_list: the list of [fsize, fparts] as `Torrent.file_list`
+    piece_length: the piece size in bytes
+    broken: the list to be appended with the indices of pieces covered by missing files
+    dest_fsizes: dict={}, the sizes of existing files keyed by their path parts, known from a walk of `spath`
+        Files not found in it are looked up by a stat call.
+    '''
+    blank = _blankPiece(piece_length)[0] # yielded for whole blank pieces, which `hash()` recognizes at once
+    blank_view = memoryview(blank) # copy zeros from it instead of allocating new ones
+    piece = bytearray(piece_length)
+    piece_view = memoryview(piece)
+    filled = 0
+    piece_idx = 0
+    for fsize, fparts in file_list:
+        dest_fpath = spath.joinpath(*fparts)
+        if (dest_fsize := dest_fsizes.get(fparts)) is None: # e.g. a single file or under a symlinked directory
+            try: # a single stat call to tell both the existence and the size of the file
+                dest_fstat = dest_fpath.stat()
+                dest_fsize = dest_fstat.st_size if S_ISREG(dest_fstat.st_mode) else None
+            except OSError:
+                pass
+        if dest_fsize is not None:
+            read_quota = min(fsize, dest_fsize) # we only need to load the smaller file size
+            with dest_fpath.open('rb', buffering=0) as dest_fobj:
+                _adviseSequential(dest_fobj)
+                if read_quota >= piece_length: # yield whole pieces as slices of the mapped file instead of copying
+                    try:
+                        dest_mmap = mmap.mmap(dest_fobj.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (OSError, ValueError): # e.g. too large to map on 32-bit platforms, just read it then
+                        dest_mmap = None
+                    if dest_mmap is not None:
+                        # not closed explicitly, as the yielded slices may be still in hashing
+                        # the map is closed by itself when the last slice is released
+                        _adviseSequentialMmap(dest_mmap)
+                        dest_view = memoryview(dest_mmap)
+                        offset = 0
+                        if filled: # complete the piece spanning from the previous file first
+                            offset = piece_length - filled
+                            piece_view[filled:] = dest_view[:offset]
+                            yield piece
+                            piece_idx += 1
+                            piece = bytearray(piece_length)
+                            piece_view = memoryview(piece)
+                        while offset + piece_length <= read_quota:
+                            yield dest_view[offset : offset + piece_length]
+                            piece_idx += 1
+                            offset += piece_length
+                        filled = read_quota - offset # the tail spans to the next file
+                        piece_view[:filled] = dest_view[offset:read_quota]
+                        read_quota = 0
+                while (read_size := dest_fobj.readinto(piece_view[filled : min(piece_length, filled + read_quota)])):
+                    filled += read_size
+                    if filled == piece_length: # a new buffer is needed as the yielded one may be still in hashing
+                        yield piece
+                        piece_idx += 1
+                        piece = bytearray(piece_length)
+                        piece_view = memoryview(piece)
+                        filled = 0
+                    read_quota -= read_size
+            if (diff := fsize - dest_fsize) > 0: # smaller file read, the remaining bytes are zeros
+                # complete the current piece with zeros first
+                fill = min(diff, piece_length - filled)
+                piece_view[filled : filled + fill] = blank_view[:fill]
+                filled += fill
+                diff -= fill
+                if filled == piece_length:
+                    yield piece
+                    piece_idx += 1
+                    piece = bytearray(piece_length)
+                    piece_view = memoryview(piece)
+                    filled = 0
+                # whole blank pieces are not built one by one, but share the same blank piece
+                n_blank_piece, diff = divmod(diff, piece_length)
+                for _ in range(n_blank_piece):
+                    yield blank
+                    piece_idx += 1
+                if diff: # the remainder is less than a piece, start the next piece with it
+                    piece_view[:diff] = blank_view[:diff]
+                    filled = diff
+        else: # the file does not exist, pieces covered by it are broken whatever their hashes are
+            n_empty_piece, filled = divmod(filled + fsize, piece_length)
+            piece_view[:filled] = blank_view[:filled] # it should be OK to just replace existing bytes by \0
+            for _ in range(n_empty_piece):
+                broken.append(piece_idx)
+                yield blank
+                piece_idx += 1
+    if filled: # remainder
+        yield piece_view[:filled]
+
+
 '''=====================================================================================================================
 Core Torrent Class
 ====================================================================================================================='''
 
 
+# whitespaces and underscores are ignored in metadata keys supplied to `Torrent.get()` and `Torrent.set()`
+_KEY_STRIP_TABLE = str.maketrans('', '', string.whitespace + '_')
+
+# characters that are not allowed in torrent name, deleted by `str.translate()` to detect their presence
+_NAME_STRIP_TABLE = str.maketrans('', '', r'\/:*?"<>|')
+
+# map every key alias accepted by `Torrent.set()` to its backend setter
+_SETTER_ALIASES = {alias: setter for setter, aliases in (
+    ('setTracker', ('t', 'tr', 'tracker', 'trackers', 'trackerlist', 'announce', 'announces', 'announcelist')),
+    ('setComment', ('c', 'comment', 'comments')),
+    ('setCreator', ('b', 'by', 'createdby', 'creator', 'tool', 'creatingtool')),
+    ('setDate', ('d', 'date', 'time', 'second', 'seconds', 'creationdate', 'creationtime', 'creatingdate', 'creatingtime')),
+    ('setEncoding', ('e', 'enc', 'encoding', 'codec')),
+    ('setName', ('n', 'name', 'torrentname')),
+    ('setPieceLength', ('ps', 'pl', 'piecesize', 'piecelength')),
+    ('setPrivate', ('p', 'private', 'privatetorrent', 'torrentprivate')),
+    ('setSource', ('s', 'src', 'source')),
+) for alias in aliases}
+
+# these aliases call their setter with the negated value
+_NEGATED_SETTER_ALIASES = dict.fromkeys(('pub', 'public', 'publictorrent', 'torrentpublic'), 'setPrivate')
+
+
 class Torrent():
 
 
@@ -162,19 +531,29 @@ class Torrent():
         '''
 
         # internal attributes and their default values
-        self._tracker_lst = list()          # for `announce` and `announce-list`
+        self._tracker_dct = dict()          # for `announce` and `announce-list`, ordered keys with None values
         self._comment_str = str()           # for `comment`
         self._creator_str = str()           # for `created by`
         self._datesec_int = 0               # for `creation date`
         self._enc4txt_str = 'UTF-8'         # for `encoding`
-        self._srcpath_lst = list()          # for `files`
+        self._srcpart_lst = list()          # for `files`, path parts of each file as a tuple of str
         self._srcsize_lst = list()          # for `length`
+        self._srcsize_int = 0               # the sum of `_srcsize_lst`, updated along with it
         self._trtname_str = str()           # for `name`
         self._piecesz_int = 4096 << 10      # for `piece length`
         self._srcsha1_byt = bytes()         # for `pieces`
         self._private_int = 0               # for `private`
         self._tsource_str = str()           # for `source`
 
+        # internal caches, which are dropped on any metadata change
+        self._bcdinfo_byt = None            # bencoded `info`
+        self._infohsh_str = None            # torrent hash
+        self._magnetl_str = None            # magnet link
+        self._problms_lst = None            # problems found by `check()`
+        self._bcdtrnt_byt = None            # bencoded torrent
+        self._srcends_lst = None            # cumulative end offsets of each file
+        self._srcname_dct = None            # file indices grouped by the last path part
+
         # metadata init
         self.set(**kwargs)
 
@@ -189,7 +568,7 @@ class Torrent():
     @property
     def announce(self) -> str:
         '''Return the first tracker, or empty string if none.'''
-        return self._tracker_lst[0] if self._tracker_lst else ''
+        return next(iter(self._tracker_dct), '')
 
     @announce.setter
     def announce(self, url):
@@ -201,7 +580,7 @@ class Torrent():
     @property
     def announce_list(self) -> list:
         '''Return all trackers if no less than 2, otherwise empty list.'''
-        return self._tracker_lst if len(self._tracker_lst) >= 2 else []
+        return list(self._tracker_dct) if len(self._tracker_dct) >= 2 else []
 
     @announce_list.setter
     def announce_list(self, urls):
@@ -259,8 +638,8 @@ class Torrent():
     @property
     def files(self) -> list:
         '''Return the list of list of file size and path parts if no less than 2 files (repel `length`). Read-only.'''
-        return list([fsize, fpath.parts] for fsize, fpath in zip(self._srcsize_lst, self._srcpath_lst)) \
-               if len(self._srcpath_lst) >= 2 else []
+        return list([fsize, fparts] for fsize, fparts in zip(self._srcsize_lst, self._srcpart_lst)) \
+               if len(self._srcpart_lst) >= 2 else []
 
 
     @property
@@ -327,7 +706,7 @@ class Torrent():
     @property
     def tracker_list(self) -> list:
         '''Unlike `announce_list`, always returns the full tracker list unconditionally.'''
-        return self._tracker_lst
+        return list(self._tracker_dct)
 
     @tracker_list.setter
     def tracker_list(self, urls):
@@ -338,19 +717,19 @@ class Torrent():
     @property
     def file_list(self) -> list:
         '''Unlike `files` and `length`, always returns the full file size and paths unconditionally. Read-only.'''
-        return list([fsize, fpath.parts] for fsize, fpath in zip(self._srcsize_lst, self._srcpath_lst))
+        return list([fsize, fparts] for fsize, fparts in zip(self._srcsize_lst, self._srcpart_lst))
 
 
     @property
     def size(self) -> int:
         '''Return the total size of all source files in the torrent. Read-only.'''
-        return sum(self._srcsize_lst)
+        return self._srcsize_int
 
 
     @property
     def torrent_size(self) -> int:
         '''Return the size of the torrent file itself (not source files). Read-only.'''
-        return len(bencode(self.torrent_dict, self.encoding))
+        return len(self._bencodeTorrent())
 
 
     @property
@@ -368,20 +747,23 @@ class Torrent():
     @property
     def hash(self) -> str:
         '''Return the torrent hash at the moment. Read-only.'''
-        return hash(bencode(self.info_dict, self.encoding)).hex()
+        if self._infohsh_str is None:
+            self._infohsh_str = hash(self._bencodeInfo()).hex()
+        return self._infohsh_str
 
 
     @property
     def magnet(self) -> str:
         '''Return the magnet link of the torrent. Read-only.'''
-        ret = f"magnet:?xt=urn:btih:{self.hash}"
-        if self.name:
-            ret += f"&dn={urllib.parse.quote(self.name)}"
-        if self.size:
-            ret += f"&xl={self.size}"
-        for url in self.tracker_list:
-            ret += f"&tr={urllib.parse.quote(url)}"
-        return ret
+        if self._magnetl_str is None: # cached along with the hash, as trackers are quoted char by char
+            ret = f"magnet:?xt=urn:btih:{self.hash}"
+            if self.name:
+                ret += f"&dn={_quote(self.name)}"
+            if self.size:
+                ret += f"&xl={self.size}"
+            ret += ''.join(f"&tr={_quote(url)}" for url in self._tracker_dct)
+            self._magnetl_str = ret
+        return self._magnetl_str
 
 
     def get(self, key, ret=None):
@@ -408,7 +790,7 @@ class Torrent():
         All whitespaces and underscores will be stripped (e.g. dA_te == date).
         Same as calls to properties, this method does not raise error on key inexistence, but return None(default).
         '''
-        key = re.sub(r'[\s_]', '', key).lower()
+        key = key.translate(_KEY_STRIP_TABLE).lower()
         if key in ('t', 'tr', 'tracker', 'trackers', 'trackerlist', 'announce', 'announces', 'announcelist'):
             ret = self.tracker_list
         elif key in ('c', 'comment', 'comments'):
@@ -454,52 +836,13 @@ class Torrent():
     @property
     def info_dict(self) -> dict:
         '''Return the `info` dict of the torrent that affects hash. Read-only.'''
-        info_dict = {}
-        if self.length:
-            info_dict[b'length'] = self.length
-        if self.files:
-            info_dict[b'files'] = []
-            for fsize, fpath_parts in self.files:
-                info_dict[b'files'].append({b'length': fsize, b'path': fpath_parts})
-        if self.name:
-            info_dict[b'name'] = self.name
-        if self.piece_length:
-            info_dict[b'piece length'] = self.piece_length
-        if self.pieces:
-            info_dict[b'pieces'] = self.pieces
-        if self.private:
-            info_dict[b'private'] = self.private
-        if self.source:
-            info_dict[b'source'] = self.source
-        return info_dict
+        return self._infoDict()
 
 
     @property
     def torrent_dict(self) -> bytes:
         '''Return the complete dict of the torrent, ready to be bencoded and saved. Read-only.'''
-        torrent_dict = {b'info':{}}
-
-        # keys that not impact torrent hash
-        if self.announce:
-            torrent_dict[b'announce'] = self.announce
-        if self.announce_list:
-            torrent_dict[b'announce-list'] = list([url] for url in self.announce_list)
-        if self.comment:
-            torrent_dict[b'comment'] = self.comment
-        if self.creation_date:
-            torrent_dict[b'creation date'] = self.creation_date
-        if self.created_by:
-            torrent_dict[b'created by'] = self.created_by
-        if self.encoding:
-            torrent_dict[b'encoding'] = self.encoding
-
-        # keys that impact torrent hash
-        torrent_dict[b'info'] = self.info_dict
-
-        # additional key to store the original hash
-        torrent_dict[b'hash'] = self.hash
-
-        return torrent_dict
+        return self._torrentDict(self.info_dict)
 
 
 
@@ -517,23 +860,11 @@ class Torrent():
         top: bool=True, place added trackers to the top if True, otherwise bottom.
         '''
         urls = [urls] if isinstance(urls, str) else list(urls)
-        if top:
-            for url in urls[::-1]: # we're appending left, so reverse it
-                try:
-                    idx = self._tracker_lst.index(url)
-                except ValueError: # not found, add it
-                    self._tracker_lst.insert(0, url)
-                else: # found, remove the existing and push it to top
-                    self._tracker_lst.pop(idx)
-                    self._tracker_lst.insert(0, url)
-        else:
-            for url in urls:
-                try:
-                    idx = self._tracker_lst.index(url)
-                except ValueError: # not found, add it
-                    self.append(url)
-                else: # found, no need to update its position
-                    pass
+        if top: # rebuild the dict so that the supplied urls come first, existing ones are moved to the top
+            self._tracker_dct = dict.fromkeys(chain(urls, self._tracker_dct))
+        else: # only add new urls to the bottom, existing ones keep their position on update
+            self._tracker_dct.update(dict.fromkeys(urls))
+        self._clearCache()
 
 
     def setTracker(self, urls, /):
@@ -542,9 +873,9 @@ class Torrent():
         Argument:
         urls: The tracker urls, can be a single string or an iterable of strings. Auto deduplicate.
         '''
-        urls = [urls] if isinstance(urls, str) else list(urls)
-        self._tracker_lst.clear()
-        self.addTracker(urls) # `addTracker() will deduplicate
+        urls = [urls] if isinstance(urls, str) else urls
+        self._tracker_dct = dict.fromkeys(urls) # deduplicate in a single pass, no need to merge with existing ones
+        self._clearCache()
 
 
     def rmTracker(self, urls, /):
@@ -553,14 +884,10 @@ class Torrent():
         Arguments:
         urls: The tracker urls, can be a single string or an iterable of strings.
         '''
-        urls = {urls} if isinstance(urls, str) else set(urls)
+        urls = [urls] if isinstance(urls, str) else urls
         for url in urls:
-            try:
-                idx = self._tracker_lst.index(url)
-            except ValueError:
-                continue # not found, skip
-            else:
-                self._tracker_lst.pop(idx) # found, remove it
+            self._tracker_dct.pop(url, None) # skip if not found
+        self._clearCache()
 
 
     def setComment(self, comment, /):
@@ -569,6 +896,7 @@ class Torrent():
         Argument:
         comment: The comment message as str.'''
         self._comment_str = str(comment)
+        self._clearCache()
 
 
     def setCreator(self, creator, /):
@@ -577,6 +905,7 @@ class Torrent():
         Argument:
         creator: The str of the creator.'''
         self._creator_str = str(creator)
+        self._clearCache()
 
 
     def setDate(self, date, /):
@@ -596,6 +925,7 @@ class Torrent():
             self._datesec_int = int(time.mktime(tuple(date)))
         else:
             raise ValueError('Supplied date is not understood.')
+        self._clearCache()
 
 
     def setEncoding(self, enc, /):
@@ -605,8 +935,9 @@ class Torrent():
         enc: The encoding, must be a valid one in python.
         '''
         enc = str(enc)
-        codecs.lookup(enc) # will raise LookupError if this encoding not exists
+        _lookupCodec(enc) # will raise LookupError if this encoding not exists
         self._enc4txt_str = enc # respect the encoding str supplied by user
+        self._clearCache()
 
 
     def setName(self, name, /):
@@ -617,9 +948,10 @@ class Torrent():
         name = str(name)
         if not name:
             raise ValueError('Torrent name cannot be empty.')
-        if not all([False if (char in name) else True for char in r'\/:*?"<>|' ]):
+        if len(name.translate(_NAME_STRIP_TABLE)) != len(name):
             raise ValueError('Torrent name contains invalid character.')
         self._trtname_str = name
+        self._clearCache()
 
 
     def setPieceLength(self, size, /, no_check=False):
@@ -641,11 +973,12 @@ class Torrent():
 
         if size < 16384: # piece size must be larger than 16KiB
             raise PieceSizeTooSmall()
-        if (not no_check) and ((math.log2(size / 262144) % 1) or (size < 262144) or (size > 33554432)):
+        if (not no_check) and ((size & (size - 1)) or (size < 262144) or (size > 33554432)): # not a power of 2
             raise PieceSizeUncommon()
         if size != self._piecesz_int: # changing piece size will clear existing hash
             self._srcsha1_byt = bytes()
         self._piecesz_int = size
+        self._clearCache()
 
 
     def setPrivate(self, private, /):
@@ -655,6 +988,7 @@ class Torrent():
         private: Any value that can be converted to `bool`; private torrent if `True`.
         '''
         self._private_int = int(bool(private))
+        self._clearCache()
 
 
     def setSource(self, src, /):
@@ -664,6 +998,7 @@ class Torrent():
         src: The message text that can be converted to `str`.
         '''
         self._tsource_str = str(src)
+        self._clearCache()
 
 
     def set(self, **metadata):
@@ -685,27 +1020,11 @@ class Torrent():
         Note that the values of keys have the same requirement as each backend function.
         '''
         for key, value in metadata.items():
-            key = re.sub(r'[\s_]', '', key).lower()
-            if key in ('t', 'tr', 'tracker', 'trackers', 'trackerlist', 'announce', 'announces', 'announcelist'):
-                self.setTracker(value)
-            elif key in ('c', 'comment', 'comments'):
-                self.setComment(value)
-            elif key in ('b', 'by', 'createdby', 'creator', 'tool', 'creatingtool'):
-                self.setCreator(value)
-            elif key in ('d', 'date', 'time', 'second', 'seconds', 'creationdate', 'creationtime', 'creatingdate', 'creatingtime'):
-                self.setDate(value)
-            elif key in ('e', 'enc', 'encoding', 'codec'):
-                self.setEncoding(value)
-            elif key in ('n', 'name', 'torrentname'):
-                self.setName(value)
-            elif key in ('ps', 'pl', 'piecesize', 'piecelength'):
-                self.setPieceLength(value)
-            elif key in ('p', 'private', 'privatetorrent', 'torrentprivate'):
-                self.setPrivate(value)
-            elif key in ('pub', 'public', 'publictorrent', 'torrentpublic'):
-                self.setPrivate(not value)
-            elif key in ('s', 'src', 'source'):
-                self.setSource(value)
+            key = key.translate(_KEY_STRIP_TABLE).lower()
+            if (setter := _SETTER_ALIASES.get(key)):
+                getattr(self, setter)(value)
+            elif (setter := _NEGATED_SETTER_ALIASES.get(key)):
+                getattr(self, setter)(not value)
             else:
                 raise KeyError(f"Unknown key: {key}.")
 
@@ -727,24 +1046,26 @@ class Torrent():
 
         # we need to know encoding first
         encoding = torrent_dict.get(b'encoding', b'UTF-8').decode()                 # str
+        decode = methodcaller('decode', encoding)                                   # shared by all strings
+        info = torrent_dict.get(b'info', {})                                        # looked up once
 
         # tracker list
         trackers = [torrent_dict[b'announce']] if torrent_dict.get(b'announce') else []
         trackers += list(chain(*torrent_dict[b'announce-list'])) if torrent_dict.get(b'announce-list') else []
-        trackers = list(map(methodcaller('decode', encoding), trackers))            # bytes to str
+        trackers = list(map(decode, trackers))                                      # bytes to str
         trackers = list(dict.fromkeys(trackers))                                    # ordered deduplicate
 
         # other keys
         comment = torrent_dict.get(b'comment', b'').decode(encoding)                # str
         created_by = torrent_dict.get(b'created by', b'').decode(encoding)          # str
         creation_date = torrent_dict.get(b'creation date', 0)                       # int
-        files = torrent_dict.get(b'info').get(b'files', [])                         # list
-        length = torrent_dict.get(b'info').get(b'length', 0)                        # int
-        name = torrent_dict.get(b'info').get(b'name', b'').decode(encoding)         # str
-        piece_length = torrent_dict.get(b'info').get(b'piece length', 0)            # int
-        pieces = torrent_dict.get(b'info').get(b'pieces', b'')                      # str
-        private = torrent_dict.get(b'info').get(b'private', 0)                      # int
-        source = torrent_dict.get(b'info').get(b'source', b'').decode(encoding)     # str
+        files = info.get(b'files', [])                                              # list
+        length = info.get(b'length', 0)                                             # int
+        name = info.get(b'name', b'').decode(encoding)                              # str
+        piece_length = info.get(b'piece length', 0)                                 # int
+        pieces = info.get(b'pieces', b'')                                           # str
+        private = info.get(b'private', 0)                                           # int
+        source = info.get(b'source', b'').decode(encoding)                          # str
 
         # everything looks good, now let's write attributes
         self.setTracker(trackers)
@@ -759,18 +1080,21 @@ class Torrent():
 
         self._srcsha1_byt = pieces
         if length and not files:
-            self._srcpath_lst = [pathlib.Path('.')]
+            self._srcpart_lst = [()]
             self._srcsize_lst = [length]
+            self._srcsize_int = length
         elif not length and files:
             fsize_list = []
-            fpath_list = []
+            fparts_list = []
             for file in files:
                 fsize_list.append(file[b'length'])
-                fpath_list.append(pathlib.Path().joinpath(*map(methodcaller('decode', encoding), file[b'path'])))
+                fparts_list.append(tuple(map(decode, file[b'path'])))
             self._srcsize_lst = fsize_list
-            self._srcpath_lst = fpath_list
+            self._srcsize_int = sum(fsize_list)
+            self._srcpart_lst = fparts_list
         else:
             raise ValueError('Unexpected error in handling source files structure.')
+        self._clearCache()
 
 
     def readMetadata(self, tpath, /, include_key={}, exclude_key={'source'}):
@@ -799,7 +1123,7 @@ class Torrent():
         template.read(tpath)
         for key in include_key.difference(exclude_key):
             if key == 'tracker':
-                self._tracker_lst.addTracker(template.trackers)
+                self.addTracker(template.tracker_list)
                 continue
             elif key == 'comment' and template.comment:
                 self._comment_str = template.comment
@@ -817,6 +1141,7 @@ class Torrent():
                 self._tsource_str = template.source
                 continue
             raise RuntimeError('Loop not correctly continued.')
+        self._clearCache()
 
 
     def load(self, spath, keep_name=False, show_progress=False):
@@ -837,46 +1162,37 @@ class Torrent():
         keep_name = bool(keep_name)
         show_progress = bool(show_progress)
 
-        fpaths = [spath] if spath.is_file() else sorted(filter(methodcaller('is_file'), spath.rglob('*')))
-        fpath_list = [fpath.relative_to(spath) for fpath in fpaths]
-        fsize_list = [fpath.stat().st_size for fpath in fpaths]
-        if sum(fsize_list):
-            if show_progress: # TODO: stdout is dirty in core class method and should be moved out in the future
-                sha1 = b''
-                piece_bytes = bytes()
-                pbar1 = tqdm.tqdm(total=sum(fsize_list), desc='Size', unit='B', unit_scale=True, ascii=True, dynamic_ncols=True)
+        if spath.is_file():
+            fpaths = [spath]
+            fsize_list = [spath.stat().st_size]
+        else: # sorted as paths rather than str, so that the file order is the same as before
+            fentries = sorted((pathlib.Path(fpath), fsize) for fpath, fsize in _walkFiles(spath))
+            fpaths = [fpath for fpath, _ in fentries]
+            fsize_list = [fsize for _, fsize in fentries]
+        fparts_list = [fpath.relative_to(spath).parts for fpath in fpaths]
+        if (size := sum(fsize_list)):
+            if len(fpaths) == 1 and size <= self.piece_length and hasattr(hashlib, 'file_digest'): # python 3.11+
+                # a single file within a single piece, let hashlib stream it through its own buffer
+                with fpaths[0].open('rb', buffering=0) as fobj:
+                    sha1 = hashlib.file_digest(fobj, _sha1).digest()
+            elif show_progress: # TODO: stdout is dirty in core class method and should be moved out in the future
+                pbar1 = tqdm.tqdm(total=size, desc='Size', unit='B', unit_scale=True, ascii=True, dynamic_ncols=True)
                 pbar2 = tqdm.tqdm(total=len(fsize_list), desc='File', unit='', ascii=True, dynamic_ncols=True)
-                for fpath in fpaths:
-                    with fpath.open('rb', buffering=0) as fobj:
-                        while (read_bytes := fobj.read(self.piece_length - len(piece_bytes))):
-                            piece_bytes += read_bytes
-                            if len(piece_bytes) == self.piece_length:
-                                sha1 += hash(piece_bytes)
-                                piece_bytes = bytes()
-                            pbar1.update(len(read_bytes))
-                        pbar2.update(1)
-                sha1 += hash(piece_bytes) if piece_bytes else b''
+                sha1 = b''.join(hashMany(_readPieces(fpaths, self.piece_length, pbar1, pbar2)))
                 pbar1.close()
                 pbar2.close()
             else: # not show progress bar
-                sha1 = b''
-                piece_bytes = bytes()
-                for fpath in fpaths:
-                    with fpath.open('rb', buffering=0) as fobj:
-                        while (read_bytes := fobj.read(self.piece_length - len(piece_bytes))):
-                            piece_bytes += read_bytes
-                            if len(piece_bytes) == self.piece_length:
-                                sha1 += hash(piece_bytes)
-                                piece_bytes = bytes()
-                sha1 += hash(piece_bytes) if piece_bytes else b''
+                sha1 = b''.join(hashMany(_readPieces(fpaths, self.piece_length)))
         else:
             raise EmptySourceSize()
 
         # Everything looks good, let's update internal parameters
         self.name = self.name if keep_name else spath.name
-        self._srcpath_lst = fpath_list
+        self._srcpart_lst = fparts_list
         self._srcsize_lst = fsize_list
+        self._srcsize_int = size
         self._srcsha1_byt = sha1
+        self._clearCache()
 
 
     def write(self, tpath, overwrite=False):
@@ -897,7 +1213,7 @@ class Torrent():
             raise FileExistsError(f"The target '{fpath}' already exists.")
         else:
             fpath.parent.mkdir(parents=True, exist_ok=True)
-            fpath.write_bytes(bencode(self.torrent_dict, self.encoding))
+            fpath.write_bytes(self._bencodeTorrent())
 
 
     def verify(self, spath):
@@ -932,34 +1248,18 @@ class Torrent():
         else:
             raise RuntimeError('Unexpected Error.')
 
-        piece_bytes = bytes()
-        piece_idx = 0
+        # walk the destination once for the sizes of existing files, rather than stat them one by one
+        dest_fsizes = {pathlib.Path(fpath).relative_to(spath).parts: fsize
+                       for fpath, fsize in _walkFiles(spath)} if self.num_files > 1 else {}
+
+        # pieces are hashed in a thread pool while reading ahead, and compared in bulk at the end
         piece_error_list = []
-        for fsize, fpath in self.file_list:
-            dest_fpath = spath.joinpath(*fpath)
-            if dest_fpath.is_file():
-                read_quota = min(fsize, dest_fpath.stat().st_size) # we only need to load the smaller file size
-                with dest_fpath.open('rb', buffering=0) as dest_fobj:
-                    while (read_bytes := dest_fobj.read(min(self.piece_length - len(piece_bytes), read_quota))):
-                        piece_bytes += read_bytes
-                        if len(piece_bytes) == self.piece_length: # whole piece loaded
-                            if hash(piece_bytes) != self.pieces[20 * piece_idx : 20 * piece_idx + 20]: # sha1 mismatch
-                                piece_error_list.append(piece_idx)
-                            piece_idx += 1          # whole piece loaded, piece index increase
-                            piece_bytes = bytes()   # whole piece loaded, clear existing bytes
-                        if (read_quota := read_quota - len(read_bytes)) == 0: # smaller file read
-                            # we need to fill remaining bytes
-                            piece_bytes += b'\0' * diff if (diff := fsize - dest_fpath.stat().st_size) > 0 else b''
-                            break
-            else: # the file does not exist
-                size = len(piece_bytes) + fsize
-                n_empty_piece, piece_blank_shift = divmod(size, self.piece_length)
-                piece_bytes = b'\0' * piece_blank_shift # it should be OK to just replace existing piece_bytes by \0
-                for _ in range(n_empty_piece):
-                    piece_error_list.append(piece_idx)
-                    piece_idx += 1
-        if piece_bytes and hash(piece_bytes) != self.pieces[20 * piece_idx : 20 * piece_idx + 20]: # remainder
-            piece_error_list.append(piece_idx)
+        sha1 = b''.join(hashMany(_readDestPieces(spath, self.file_list, self.piece_length, piece_error_list,
+                                                 dest_fsizes)))
+        if sha1 != (pieces := self.pieces): # only look into each piece on mismatch, as most are expected to be fine
+            piece_error_list.extend(i for i in range(len(sha1) // 20)
+                                    if sha1[20 * i : 20 * i + 20] != pieces[20 * i : 20 * i + 20])
+            piece_error_list = sorted(set(piece_error_list))
 
         return piece_error_list
 
@@ -970,7 +1270,10 @@ class Torrent():
 
 
     def check(self):
-        '''Return the problems within the torrent.'''
+        '''Return the problems within the torrent, which are cached until the next metadata change.'''
+        if self._problms_lst is not None: # a copy, so that the cache is not changed by the caller
+            return self._problms_lst.copy()
+
         ret = []
         if not self.name:
             ret.append('Torrent name has not been set.')
@@ -987,14 +1290,107 @@ class Torrent():
         if self.piece_length * self.num_pieces < self.size:
             ret.append('Too less pieces for content size.')
         try:
-            codecs.lookup(self.encoding)
+            _lookupCodec(self.encoding)
         except LookupError as e:
             ret.append(f"Invalid encoding {self.encoding}.")
-        try:
-            bencode(self.torrent_dict, self.encoding)
+        try: # the result is cached for `write()` and `torrent_size`, so it is not encoded again on later calls
+            self._bencodeTorrent()
         except Exception as e:
             ret.append(f"Torrent bencoding failed ({e}).")
-        return ret
+        self._problms_lst = ret
+        return ret.copy()
+
+
+    def _clearCache(self):
+        '''Drop the cached bencoded torrent and hash. Must be called whenever any metadata changes.'''
+        self._bcdinfo_byt = None
+        self._infohsh_str = None
+        self._magnetl_str = None
+        self._problms_lst = None
+        self._bcdtrnt_byt = None
+        self._srcends_lst = None
+        self._srcname_dct = None
+
+
+    def _fileEnds(self) -> list:
+        '''Return the end offset of each file within the whole content, which is cached until the next metadata change.'''
+        if self._srcends_lst is None:
+            self._srcends_lst = list(accumulate(self._srcsize_lst))
+        return self._srcends_lst
+
+
+    def _fileNames(self) -> dict:
+        '''Return the file indices grouped by the last path part, which is cached until the next metadata change.'''
+        if self._srcname_dct is None:
+            self._srcname_dct = dict()
+            for i, fparts in enumerate(self._srcpart_lst): # single file has no parts and is keyed by None
+                self._srcname_dct.setdefault(fparts[-1] if fparts else None, []).append(i)
+        return self._srcname_dct
+
+
+    def _infoDict(self, bencode_files=False) -> dict:
+        '''Return the `info` dict of the torrent, optionally with the `files` list already bencoded.'''
+        info_dict = {}
+        if (length := self.length):
+            info_dict[b'length'] = length
+        if len(self._srcpart_lst) >= 2: # same condition as `files`, but build the dicts in a single pass
+            if bencode_files:
+                info_dict[b'files'] = _Bencoded(_bencodeFileList(self._srcsize_lst, self._srcpart_lst, self.encoding))
+            else:
+                info_dict[b'files'] = [{b'length': fsize, b'path': fparts}
+                                       for fsize, fparts in zip(self._srcsize_lst, self._srcpart_lst)]
+        if self.name:
+            info_dict[b'name'] = self.name
+        if self.piece_length:
+            info_dict[b'piece length'] = self.piece_length
+        if self.pieces:
+            info_dict[b'pieces'] = self.pieces
+        if self.private:
+            info_dict[b'private'] = self.private
+        if self.source:
+            info_dict[b'source'] = self.source
+        return info_dict
+
+
+    def _bencodeInfo(self) -> bytes:
+        '''Return the bencoded `info` dict, which is cached until the next metadata change.'''
+        if self._bcdinfo_byt is None:
+            self._bcdinfo_byt = bencode(self._infoDict(bencode_files=True), self.encoding)
+        return self._bcdinfo_byt
+
+
+    def _torrentDict(self, info) -> dict:
+        '''Return the complete dict of the torrent with the supplied `info`, which may be already bencoded.'''
+        torrent_dict = {b'info':{}}
+
+        # keys that not impact torrent hash
+        if self.announce:
+            torrent_dict[b'announce'] = self.announce
+        if (announce_list := self.announce_list):
+            torrent_dict[b'announce-list'] = list([url] for url in announce_list)
+        if self.comment:
+            torrent_dict[b'comment'] = self.comment
+        if self.creation_date:
+            torrent_dict[b'creation date'] = self.creation_date
+        if self.created_by:
+            torrent_dict[b'created by'] = self.created_by
+        if self.encoding:
+            torrent_dict[b'encoding'] = self.encoding
+
+        # keys that impact torrent hash
+        torrent_dict[b'info'] = info
+
+        # additional key to store the original hash
+        torrent_dict[b'hash'] = self.hash
+
+        return torrent_dict
+
+
+    def _bencodeTorrent(self) -> bytes:
+        '''Return the bencoded torrent, which is cached until the next metadata change.'''
+        if self._bcdtrnt_byt is None: # embed the cached bencoded `info` rather than encoding it again
+            self._bcdtrnt_byt = bencode(self._torrentDict(_Bencoded(self._bencodeInfo())), self.encoding)
+        return self._bcdtrnt_byt
 
 
     def index(self, path, /, num=1):
@@ -1014,17 +1410,25 @@ class Torrent():
         if self.check():
             raise TorrentNotReadyError('Torrent is not ready for indexing.')
 
+        # only files sharing the last path part can match, so look them up rather than scanning the whole file list
+        # the single file of a single-file torrent has no path part and matches anything as before
+        if fparts:
+            fnames = self._fileNames()
+            fidx_iter = chain(fnames.get(fparts[-1], ()), fnames.get(None, ()))
+        else:
+            fidx_iter = range(len(self._srcpart_lst))
+
         ret = []
-        loaded_size = 0
-        for fsize, fpath in self.file_list:
+        fends = self._fileEnds()
+        for i in fidx_iter:
+            fpath = self._srcpart_lst[i]
             n_shorter = min(len(fpath), len(fparts))
             if fpath[:-n_shorter-1:-1] == fparts[:-n_shorter-1:-1]:
                 ret.append([os.path.join(self.name, *fpath),
-                            math.floor(loaded_size / self.piece_length),
-                            math.ceil((loaded_size + fsize) / self.piece_length)])
+                            math.floor((fends[i] - self._srcsize_lst[i]) / self.piece_length),
+                            math.ceil(fends[i] / self.piece_length)])
                 if (num := num - 1) == 0:
                     break
-            loaded_size += fsize
 
         return ret
 
@@ -1051,13 +1455,11 @@ class Torrent():
         if lsize >= hsize or lsize >= self.size:
             return ret
 
-        size = 0
-        for fsize, fpath in self.file_list:
-            size += fsize
-            if size > lsize:
-                ret.append(os.path.join(self.name, *fpath))
-            if size >= hsize:
-                break
+        # files are ordered by their end offsets, so binary search the first file ending after `lsize`
+        # and the first file reaching `hsize`, instead of walking through the whole file list
+        fends = self._fileEnds()
+        for i in range(bisect_right(fends, lsize), min(bisect_left(fends, hsize) + 1, len(fends))):
+            ret.append(os.path.join(self.name, *self._srcpart_lst[i]))
 
         return ret
 
@@ -1069,34 +1471,46 @@ CLI Class
 class Path(type(pathlib.Path())):
 
 
+    def _mode(self):
+        '''Return the file mode from a single stat call cached on the path, or 0 if the path does not exist.'''
+        try:
+            return self.__mode
+        except AttributeError: # the path is classified many times but only stat on the first time
+            try:
+                self.__mode = self.stat().st_mode
+            except OSError:
+                self.__mode = 0
+            return self.__mode
+
+
     def isF(self):
         '''Is file (not torrent).'''
-        return self.is_file() and self.suffix.lower() != '.torrent'
+        return S_ISREG(self._mode()) and self.suffix.lower() != '.torrent'
 
 
     def isVF(self, path):
         '''Is virtual file (not torrent).'''
-        return not self.is_dir() and self.suffix.lower() != '.torrent'
+        return not S_ISDIR(self._mode()) and self.suffix.lower() != '.torrent'
 
 
     def isT(self):
         '''Is torrent.'''
-        return self.is_file() and self.suffix.lower() == '.torrent'
+        return S_ISREG(self._mode()) and self.suffix.lower() == '.torrent'
 
 
     def isVT(self):
         '''Is virtual torrent.'''
-        return not self.is_dir() and self.suffix.lower() == '.torrent'
+        return not S_ISDIR(self._mode()) and self.suffix.lower() == '.torrent'
 
 
     def isD(self):
         '''Is directory.'''
-        return self.is_dir()
+        return S_ISDIR(self._mode())
 
 
     def isVD(self):
         '''Is virtual directory.'''
-        return self.is_dir() or not self.is_file()
+        return S_ISDIR(self._mode()) or not S_ISREG(self._mode())
 
 
 
@@ -1121,7 +1535,7 @@ class Main():
 
     @staticmethod
     def __pickCliCfg(args):
-        if args.show_progress and 'tqdm' not in globals().keys():
+        if args.show_progress and tqdm is None:
             print("I: Progress bar won't be shown as not installed, consider `python3 -m pip install tqdm`.")
             args.show_progress=False
         cfg = namedtuple('CFG', '     show_prompt       show_progress       with_time_suffix')(
@@ -1450,7 +1864,7 @@ class Main():
         if self.torrent.tracker_list:
             trnum = math.ceil(math.log10(len(self.torrent.tracker_list))) if self.torrent.tracker_list else 0
             for i, url in enumerate(self.torrent.tracker_list, start=1):
-                print(eval("f'{i:0>" + str(trnum) + "}: {url}'"))
+                print(f"{i:0>{trnum}}: {url}")
         else:
             print('No tracker')
 
@@ -1460,7 +1874,7 @@ class Main():
         else:
             fnum = math.ceil(math.log10(fnum)) if fnum else 0
             for i, (fsize, fpath) in enumerate(self.torrent.file_list, start=1):
-                print(eval("f'{i:0>" + str(fnum) + "}: {os.path.join(fpath[0], *fpath[1:])} ({fsize:,} bytes)'"))
+                print(f"{i:0>{fnum}}: {os.path.join(fpath[0], *fpath[1:])} ({fsize:,} bytes)")
                 if i == 500 and self.cfg.show_prompt:
                     print('Truncated at 500 files (use -y/--yes to list all)')
                     break
@@ -1490,7 +1904,7 @@ class Main():
             if spath.is_file() and spath.name == tname:
                 spath = self.spath
             elif spath.is_dir():
-                if Path(tname) in spath.iterdir() and (tmp := spath.joinpath(tname)).is_file():
+                if (tmp := spath.joinpath(tname)).is_file(): # a single stat, rather than listing the whole directory
                     spath = tmp
                 else:
                     self.__exit(f"E: The source file '{spath}' was not found.")
@@ -1500,7 +1914,7 @@ class Main():
             elif spath.is_dir():
                 if spath.name == tname:
                     spath = spath
-                elif Path(tname) in spath.iterdir() and (tmp := spath.joinpath(self.name)).is_dir():
+                elif (tmp := spath.joinpath(tname)).is_dir():
                     spath = tmp
                 else:
                     self.__exit(f"E: The source directory '{spath}' was not found.")
@@ -1511,8 +1925,22 @@ class Main():
         ppassed = ptotal - pbroken
 
 
-        files_broken_list = [self.torrent[i] for i in piece_broken_list]
-        files_broken_list = list(dict.fromkeys(chain(*files_broken_list)))
+        # both broken pieces and file end offsets are ascending, so map pieces to files in a single merge walk
+        file_list = self.torrent.file_list
+        fends = list(accumulate(fsize for fsize, _ in file_list))
+        psize = self.torrent.piece_length
+        fbroken_dict = dict()
+        j = 0
+        for i in piece_broken_list:
+            lsize = i * psize
+            hsize = lsize + psize
+            while fends[j] <= lsize:
+                j += 1
+            for k in range(j, len(fends)):
+                fbroken_dict[k] = None
+                if fends[k] >= hsize:
+                    break
+        files_broken_list = [os.path.join(tname, *file_list[k][1]) for k in fbroken_dict]
         ftotal = self.torrent.num_files
         fbroken = len(files_broken_list)
         fpassed = ftotal - fbroken
@@ -1546,8 +1974,8 @@ class Main():
 
 
     def _write(self):
-        fpath = self.tpath.with_suffix(
-            f"{'.' + time.strftime('%y%m%d-%H%M%S') if self.cfg.with_time_suffix else ''}.torrent")
+        tsuffix = '.' + time.strftime('%y%m%d-%H%M%S') if self.cfg.with_time_suffix else ''
+        fpath = self.tpath.with_suffix(f"{tsuffix}.torrent")
         try:
             self.torrent.write(fpath, overwrite=False)
             print(f"I: Torrent saved to '{fpath}'.")